@@ -1,6 +1,6 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
@@ -8,14 +8,180 @@ from datetime import datetime, timedelta
 import json
 import asyncio
 import uuid
+import bisect
+import time
+import re
+import threading
+from functools import lru_cache
+from contextlib import asynccontextmanager
+import csv
+import io
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring, InsertOne, ReplaceOne, ReturnDocument
+from pymongo.errors import BulkWriteError
 import logging
 
+# Parquet export is optional and only available when pyarrow is installed
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Attendance Management System", version="1.0.0")
+# Database setup
+MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+DB_NAME = os.environ.get('DB_NAME', 'attendance_system')
+
+# Connection pool settings
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '10000'))
+MONGO_WARMUP_CONNECTIONS = int(os.environ.get('MONGO_WARMUP_CONNECTIONS', str(MONGO_MIN_POOL_SIZE)))
+
+class ConnectionPoolMonitor(monitoring.ConnectionPoolListener):
+    """Track open and checked-out connections per server to report pool saturation.
+    
+    PyMongo publishes pool events from its own background threads, so counters
+    are only touched while holding the lock.
+    """
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open_connections: Dict[tuple, int] = {}
+        self.checked_out_connections: Dict[tuple, int] = {}
+        self.checkout_failures = 0
+    
+    def adjust(self, counters: Dict[tuple, int], address: tuple, delta: int):
+        with self.lock:
+            counters[address] = counters.get(address, 0) + delta
+    
+    def snapshot(self, max_pool_size: int) -> Dict:
+        """Return pool usage; each server has its own pool, so saturation is the busiest one's"""
+        with self.lock:
+            servers = {
+                f"{host}:{port}": {
+                    "open_connections": self.open_connections.get((host, port), 0),
+                    "checked_out_connections": self.checked_out_connections.get((host, port), 0)
+                }
+                for host, port in set(self.open_connections) | set(self.checked_out_connections)
+            }
+            checkout_failures = self.checkout_failures
+        
+        busiest = max((server["checked_out_connections"] for server in servers.values()), default=0)
+        return {
+            "max_pool_size": max_pool_size,
+            "open_connections": sum(server["open_connections"] for server in servers.values()),
+            "checked_out_connections": sum(server["checked_out_connections"] for server in servers.values()),
+            "checkout_failures": checkout_failures,
+            "saturation": round(busiest / max_pool_size, 3) if max_pool_size > 0 else 0,
+            "servers": servers
+        }
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        self.adjust(self.open_connections, event.address, 1)
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        self.adjust(self.open_connections, event.address, -1)
+    
+    def connection_check_out_started(self, event):
+        pass
+    
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_failures += 1
+    
+    def connection_checked_out(self, event):
+        self.adjust(self.checked_out_connections, event.address, 1)
+    
+    def connection_checked_in(self, event):
+        self.adjust(self.checked_out_connections, event.address, -1)
+
+pool_monitor = ConnectionPoolMonitor()
+
+# Created on startup and closed on shutdown by the application lifespan
+client: Optional[AsyncIOMotorClient] = None
+db = None
+
+# Worker startup and first-request timings, reported by the readiness probe
+startup_metrics: Dict[str, Any] = {
+    "startup_duration_ms": None,
+    "warmup_connections": 0,
+    "warmup_failures": 0,
+    "first_request_latency_ms": None
+}
+
+async def warm_up_connection_pool():
+    """Open pool connections ahead of traffic with concurrent pings"""
+    pings = [client.admin.command("ping") for _ in range(max(1, MONGO_WARMUP_CONNECTIONS))]
+    results = await asyncio.gather(*pings, return_exceptions=True)
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        logger.error(f"MongoDB warm-up failed for {len(failures)} of {len(results)} pings: {str(failures[0])}")
+    startup_metrics["warmup_connections"] = len(results) - len(failures)
+    startup_metrics["warmup_failures"] = len(failures)
+
+async def prepare_database():
+    """Create required indexes and seed the employee ID counter"""
+    try:
+        await db.employees.create_index("employee_id", unique=True)
+        await db.rolling_metrics.create_index("employee_id", unique=True)
+        await sync_employee_id_counter()
+        # One record per employee per day; created last so existing duplicates do not block the steps above
+        await db.attendance_records.create_index([("employee_id", 1), ("date", 1)], unique=True)
+    except Exception as e:
+        logger.error(f"Error preparing database: {str(e)}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the MongoDB client on startup and close it on shutdown"""
+    global client, db
+    start_time = time.perf_counter()
+    
+    client = AsyncIOMotorClient(
+        MONGO_URL,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        event_listeners=[pool_monitor]
+    )
+    db = client[DB_NAME]
+    
+    await warm_up_connection_pool()
+    await prepare_database()
+    startup_metrics["startup_duration_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+    logger.info(f"Worker started in {startup_metrics['startup_duration_ms']} ms")
+    
+    yield
+    
+    client.close()
+
+app = FastAPI(title="Attendance Management System", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -26,12 +192,76 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database setup
-MONGO_URL = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-DB_NAME = os.environ.get('DB_NAME', 'attendance_system')
+@app.middleware("http")
+async def record_first_request_latency(request: Request, call_next):
+    """Record how long the first request served by this worker took"""
+    if startup_metrics["first_request_latency_ms"] is not None:
+        return await call_next(request)
+    
+    start_time = time.perf_counter()
+    response = await call_next(request)
+    if startup_metrics["first_request_latency_ms"] is None:
+        startup_metrics["first_request_latency_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+        logger.info(f"First request {request.url.path} took {startup_metrics['first_request_latency_ms']} ms")
+    return response
+
+# Attendance policy settings
+ATTENDANCE_THRESHOLD = float(os.environ.get('ATTENDANCE_THRESHOLD', '70'))
+
+# How much each status counts towards attendance; a half day counts as half a present day
+ATTENDANCE_CREDIT = {"present": 1.0, "late": 1.0, "half_day": 0.5}
+
+# Check-in/out times must match this exactly to be reclassified, in Python and in Mongo
+TIME_PATTERN = r"^([01]?[0-9]|2[0-3]):[0-5][0-9]$"
+
+# Sorted attendance percentages from the latest analysis, used for threshold sweeps.
+# Tagged with the analysis id stored in Mongo so workers notice analyses run elsewhere.
+threshold_sweep_cache: Dict[str, Any] = {"analysis_id": None, "percentages": []}
+
+# Incremented before and after every write to employees or attendance records
+# so cached and in-flight analyses can be keyed by the data they were computed from
+attendance_data_version = 0
+
+# Data version of the analysis results most recently stored by this worker.
+# Other workers publish their results through the analysis_metadata pointer.
+stored_analysis_version = -1
+
+# In-flight analyze-attendance computations keyed by (data version, threshold)
+inflight_analyses: Dict[tuple, asyncio.Task] = {}
+analysis_write_lock = asyncio.Lock()
+
+# Bulk administration settings
+BULK_DELETE_BATCH_SIZE = int(os.environ.get('BULK_DELETE_BATCH_SIZE', '1000'))
 
-client = AsyncIOMotorClient(MONGO_URL)
-db = client[DB_NAME]
+# Rolling trend settings
+ROLLING_WINDOW_DAYS = 90
+ROLLING_UPDATE_MAX_ATTEMPTS = 5
+LATENESS_TREND_TOLERANCE = float(os.environ.get('LATENESS_TREND_TOLERANCE', '5'))
+
+# Export settings
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '5000'))
+
+# Exported columns and their Parquet types
+RECORD_EXPORT_COLUMNS = {
+    "employee_id": "string",
+    "date": "string",
+    "check_in_time": "string",
+    "check_out_time": "string",
+    "status": "string",
+    "hours_worked": "float"
+}
+RESULT_EXPORT_COLUMNS = {
+    "employee_id": "string",
+    "name": "string",
+    "department": "string",
+    "total_days": "int",
+    "present_days": "int",
+    "absent_days": "int",
+    "late_days": "int",
+    "half_days": "int",
+    "attendance_percentage": "float",
+    "status": "string"
+}
 
 # Pydantic models
 class Employee(BaseModel):
@@ -49,6 +279,12 @@ class NewEmployee(BaseModel):
     email: str
     phone: str
 
+class BulkEmployeeCreate(BaseModel):
+    employees: List[NewEmployee]
+
+class BulkEmployeeDelete(BaseModel):
+    employee_ids: List[str]
+
 class AttendanceRecord(BaseModel):
     employee_id: str
     date: str
@@ -65,6 +301,15 @@ class AttendanceData(BaseModel):
     work_hours_end: str = "17:00"
     late_threshold_minutes: int = 30
 
+class AttendancePolicy(BaseModel):
+    work_hours_start: str = "09:00"
+    work_hours_end: str = "17:00"
+    late_threshold_minutes: int = 30
+
+class NewAttendanceRecords(BaseModel):
+    attendance_records: List[AttendanceRecord]
+    policy: Optional[AttendancePolicy] = None
+
 class AnalysisResult(BaseModel):
     employee_id: str
     name: str
@@ -75,6 +320,8 @@ class AnalysisResult(BaseModel):
     late_days: int
     attendance_percentage: float
     status: str  # meets_threshold, below_threshold
+    half_days: int = 0
+    attendance_threshold: float = ATTENDANCE_THRESHOLD
 
 # Helper functions
 def generate_sample_data():
@@ -159,21 +406,13 @@ def generate_sample_data():
                     checkin_time = f"{checkin_minutes // 60:02d}:{checkin_minutes % 60:02d}"
                     checkout_time = f"{checkout_minutes // 60:02d}:{checkout_minutes % 60:02d}"
                     
-                    # Determine status
-                    if checkin_minutes > base_checkin + 30:  # Late by more than 30 minutes
-                        status = "late"
-                    else:
-                        status = "present"
-                    
-                    hours_worked = max(0, (checkout_minutes - checkin_minutes) / 60)
-                    
+                    # Status and hours are derived from the times by the default policy below
                     attendance_records.append(AttendanceRecord(
                         employee_id=employee.employee_id,
                         date=current_date.strftime("%Y-%m-%d"),
                         check_in_time=checkin_time,
                         check_out_time=checkout_time,
-                        status=status,
-                        hours_worked=round(hours_worked, 2)
+                        status="present"
                     ))
                 else:
                     # Absent
@@ -183,25 +422,140 @@ def generate_sample_data():
                         status="absent"
                     ))
     
+    policy = AttendancePolicy()
     return AttendanceData(
         employees=employees,
-        attendance_records=attendance_records,
+        attendance_records=reclassify_attendance_records(attendance_records, policy),
         analysis_period="Last 30 days",
-        work_hours_start="09:00",
-        work_hours_end="17:00",
-        late_threshold_minutes=30
+        work_hours_start=policy.work_hours_start,
+        work_hours_end=policy.work_hours_end,
+        late_threshold_minutes=policy.late_threshold_minutes
     )
 
-def calculate_attendance_metrics(employee: Employee, records: List[AttendanceRecord]) -> Dict:
-    """Calculate attendance metrics for an employee"""
+def is_valid_record_date(value: Optional[str]) -> bool:
+    """Check for a real YYYY-MM-DD date, the only form stored dates are compared and parsed in"""
+    if not isinstance(value, str) or not re.fullmatch(r"[0-9]{4}-[0-9]{2}-[0-9]{2}", value):
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+@lru_cache(maxsize=4096)
+def parse_time_minutes(value: Optional[str]) -> Optional[int]:
+    """Convert an HH:MM time string to minutes past midnight, or None if invalid"""
+    if not isinstance(value, str) or not re.fullmatch(TIME_PATTERN, value):
+        return None
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def resolve_attendance_policy(policy: AttendancePolicy) -> Dict:
+    """Validate a policy and precompute the minute cutoffs used for classification"""
+    start_minutes = parse_time_minutes(policy.work_hours_start)
+    end_minutes = parse_time_minutes(policy.work_hours_end)
+    if start_minutes is None or end_minutes is None or end_minutes <= start_minutes:
+        raise ValueError("Work hours must be valid HH:MM times with the end after the start")
+    if policy.late_threshold_minutes < 0:
+        raise ValueError("Late threshold must not be negative")
+    
+    return {
+        "late_cutoff_minutes": start_minutes + policy.late_threshold_minutes,
+        "half_day_hours": (end_minutes - start_minutes) / 60 / 2
+    }
+
+def reclassify_attendance_records(records: List[AttendanceRecord], policy: AttendancePolicy) -> List[AttendanceRecord]:
+    """Recompute status and hours worked from check-in/out times in a single batch pass.
+    
+    Records without a valid check-in time keep their submitted status and hours.
+    Must stay in sync with build_reclassification_pipeline.
+    """
+    cutoffs = resolve_attendance_policy(policy)
+    late_cutoff = cutoffs["late_cutoff_minutes"]
+    half_day_hours = cutoffs["half_day_hours"]
+    
+    reclassified = []
+    for record in records:
+        checkin_minutes = parse_time_minutes(record.check_in_time)
+        if checkin_minutes is None:
+            reclassified.append(record)
+            continue
+        
+        checkout_minutes = parse_time_minutes(record.check_out_time)
+        hours_worked = record.hours_worked
+        if checkout_minutes is not None:
+            hours_worked = round(max(0, checkout_minutes - checkin_minutes) / 60, 2)
+        
+        if checkout_minutes is not None and hours_worked < half_day_hours:
+            status = "half_day"
+        elif checkin_minutes > late_cutoff:
+            status = "late"
+        else:
+            status = "present"
+        
+        reclassified.append(record.copy(update={"status": status, "hours_worked": hours_worked}))
+    
+    return reclassified
+
+def build_reclassification_pipeline(policy: AttendancePolicy) -> List[Dict]:
+    """Build a MongoDB update pipeline that applies the policy server-side.
+    
+    Mirrors reclassify_attendance_records so bulk policy changes never leave the database.
+    """
+    cutoffs = resolve_attendance_policy(policy)
+    
+    def part_expr(field: str, index: int) -> Dict:
+        part = {"$arrayElemAt": [{"$split": [field, ":"]}, index]}
+        return {"$convert": {"input": part, "to": "int", "onError": None, "onNull": None}}
+    
+    def minutes_expr(field: str) -> Dict:
+        is_valid = {"$regexMatch": {"input": {"$ifNull": [field, ""]}, "regex": TIME_PATTERN}}
+        minutes = {"$add": [{"$multiply": [part_expr(field, 0), 60]}, part_expr(field, 1)]}
+        return {"$cond": [is_valid, minutes, None]}
+    
+    has_checkin = {"$ne": ["$_checkin_minutes", None]}
+    has_checkout = {"$and": [has_checkin, {"$ne": ["$_checkout_minutes", None]}]}
+    return [
+        {"$set": {
+            "_checkin_minutes": minutes_expr("$check_in_time"),
+            "_checkout_minutes": minutes_expr("$check_out_time")
+        }},
+        {"$set": {
+            "hours_worked": {"$cond": [
+                has_checkout,
+                {"$round": [{"$divide": [{"$max": [0, {"$subtract": ["$_checkout_minutes", "$_checkin_minutes"]}]}, 60]}, 2]},
+                "$hours_worked"
+            ]}
+        }},
+        {"$set": {
+            "status": {"$switch": {
+                "branches": [
+                    {"case": {"$not": [has_checkin]}, "then": "$status"},
+                    {"case": {"$and": [has_checkout, {"$lt": ["$hours_worked", cutoffs["half_day_hours"]]}]}, "then": "half_day"},
+                    {"case": {"$gt": ["$_checkin_minutes", cutoffs["late_cutoff_minutes"]]}, "then": "late"}
+                ],
+                "default": "present"
+            }}
+        }},
+        {"$unset": ["_checkin_minutes", "_checkout_minutes"]}
+    ]
+
+def attendance_credit(statuses: List[str]) -> float:
+    """Sum the attendance credit for a list of statuses"""
+    return sum(ATTENDANCE_CREDIT.get(status, 0.0) for status in statuses)
+
+def calculate_attendance_metrics(employee: Employee, records: List[AttendanceRecord], threshold: float = ATTENDANCE_THRESHOLD) -> Dict:
+    """Calculate attendance metrics for an employee against the given threshold"""
     employee_records = [r for r in records if r.employee_id == employee.employee_id]
     
     total_days = len(employee_records)
     present_days = len([r for r in employee_records if r.status in ["present", "late"]])
     absent_days = len([r for r in employee_records if r.status == "absent"])
     late_days = len([r for r in employee_records if r.status == "late"])
+    half_days = len([r for r in employee_records if r.status == "half_day"])
     
-    attendance_percentage = (present_days / total_days * 100) if total_days > 0 else 0
+    attended_days = attendance_credit([r.status for r in employee_records])
+    attendance_percentage = (attended_days / total_days * 100) if total_days > 0 else 0
     
     # Calculate average hours worked
     worked_records = [r for r in employee_records if r.hours_worked > 0]
@@ -212,34 +566,487 @@ def calculate_attendance_metrics(employee: Employee, records: List[AttendanceRec
         "present_days": present_days,
         "absent_days": absent_days,
         "late_days": late_days,
+        "half_days": half_days,
         "attendance_percentage": attendance_percentage,
         "avg_hours": avg_hours,
-        "status": "meets_threshold" if attendance_percentage >= 70 else "below_threshold"
+        "status": "meets_threshold" if attendance_percentage >= threshold else "below_threshold"
+    }
+
+def sweep_attendance_thresholds(sorted_percentages: List[float], thresholds: List[float]) -> List[Dict]:
+    """Count employees meeting each threshold using binary search over sorted percentages"""
+    total = len(sorted_percentages)
+    sweep = []
+    for threshold in thresholds:
+        meeting = total - bisect.bisect_left(sorted_percentages, threshold)
+        sweep.append({
+            "threshold": threshold,
+            "meeting_threshold": meeting,
+            "below_threshold": total - meeting,
+            "percentage_meeting": round(meeting / total * 100, 1) if total > 0 else 0
+        })
+    return sweep
+
+def absence_runs(statuses: List[str]) -> Dict:
+    """Return the trailing and longest runs of consecutive absences"""
+    longest = 0
+    current = 0
+    for status in statuses:
+        current = current + 1 if status == "absent" else 0
+        longest = max(longest, current)
+    return {"current": current, "longest": longest}
+
+def apply_records_to_rolling_state(state: Optional[Dict], records: List[AttendanceRecord]) -> Dict:
+    """Fold newly arrived records into an employee's rolling state.
+    
+    The state keeps only the last ROLLING_WINDOW_DAYS of daily statuses, so each
+    update costs O(window) regardless of how much history the employee has.
+    Absence streaks are counted within that window, so corrections and days
+    sliding out of the window can lower them.
+    """
+    window = dict(state["window"]) if state else {}
+    latest_date = state["latest_date"] if state else None
+    
+    for record in records:
+        window[record.date] = record.status
+        if latest_date is None or record.date > latest_date:
+            latest_date = record.date
+    
+    # Slide the window forward
+    cutoff = (datetime.strptime(latest_date, "%Y-%m-%d") - timedelta(days=ROLLING_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    window = {date: status for date, status in window.items() if date > cutoff}
+    
+    runs = absence_runs([window[date] for date in sorted(window)])
+    return {
+        "window": window,
+        "latest_date": latest_date,
+        "current_absence_streak": runs["current"],
+        "longest_absence_streak": runs["longest"]
+    }
+
+def summarize_rolling_state(state: Dict) -> Dict:
+    """Derive 30/90-day attendance rates, streaks and lateness trend from a rolling state"""
+    latest = datetime.strptime(state["latest_date"], "%Y-%m-%d")
+    cutoff_30 = (latest - timedelta(days=30)).strftime("%Y-%m-%d")
+    cutoff_60 = (latest - timedelta(days=60)).strftime("%Y-%m-%d")
+    
+    last_30_days = [status for date, status in state["window"].items() if date > cutoff_30]
+    previous_30_days = [status for date, status in state["window"].items() if cutoff_60 < date <= cutoff_30]
+    last_90_days = list(state["window"].values())
+    
+    def attendance_rate(statuses: List[str]) -> Optional[float]:
+        if not statuses:
+            return None
+        return round(attendance_credit(statuses) / len(statuses) * 100, 1)
+    
+    def late_rate(statuses: List[str]) -> Optional[float]:
+        if not statuses:
+            return None
+        return round(statuses.count("late") / len(statuses) * 100, 1)
+    
+    late_rate_30 = late_rate(last_30_days)
+    late_rate_previous_30 = late_rate(previous_30_days)
+    if late_rate_previous_30 is None:
+        lateness_trend = "insufficient_data"
+    elif late_rate_30 - late_rate_previous_30 > LATENESS_TREND_TOLERANCE:
+        lateness_trend = "worsening"
+    elif late_rate_previous_30 - late_rate_30 > LATENESS_TREND_TOLERANCE:
+        lateness_trend = "improving"
+    else:
+        lateness_trend = "stable"
+    
+    return {
+        "latest_date": state["latest_date"],
+        "attendance_rate_30_days": attendance_rate(last_30_days),
+        "attendance_rate_90_days": attendance_rate(last_90_days),
+        "late_rate_30_days": late_rate_30,
+        "late_rate_previous_30_days": late_rate_previous_30,
+        "lateness_trend": lateness_trend,
+        "current_absence_streak": state["current_absence_streak"],
+        "longest_absence_streak": state["longest_absence_streak"]
     }
 
+async def update_rolling_metrics(records: List[AttendanceRecord]):
+    """Incrementally update stored rolling metrics for the employees in a batch of new records.
+    
+    Each state carries a revision token and is only replaced if the token is
+    unchanged, so concurrent updates for the same employee are retried on
+    top of each other instead of overwriting each other.
+    """
+    pending: Dict[str, List[AttendanceRecord]] = {}
+    for record in records:
+        pending.setdefault(record.employee_id, []).append(record)
+    
+    for _ in range(ROLLING_UPDATE_MAX_ATTEMPTS):
+        if not pending:
+            return
+        
+        states_cursor = db.rolling_metrics.find({"employee_id": {"$in": list(pending)}})
+        states = {doc["employee_id"]: doc for doc in await states_cursor.to_list(length=None)}
+        
+        operations = []
+        revisions = {}
+        for employee_id, employee_records in pending.items():
+            previous = states.get(employee_id)
+            state = apply_records_to_rolling_state(previous, employee_records)
+            revisions[employee_id] = uuid.uuid4().hex
+            document = {"employee_id": employee_id, **state, "metrics": summarize_rolling_state(state), "revision": revisions[employee_id]}
+            if previous:
+                operations.append(ReplaceOne({"employee_id": employee_id, "revision": previous.get("revision")}, document))
+            else:
+                operations.append(InsertOne(document))
+        
+        try:
+            await db.rolling_metrics.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys mean another request created the state first; anything else is fatal
+            if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                raise
+        
+        # Retry only the employees whose state was changed by someone else
+        written_cursor = db.rolling_metrics.find({"employee_id": {"$in": list(pending)}}, {"employee_id": 1, "revision": 1})
+        written = {doc["employee_id"]: doc.get("revision") for doc in await written_cursor.to_list(length=None)}
+        pending = {
+            employee_id: employee_records for employee_id, employee_records in pending.items()
+            if written.get(employee_id) != revisions[employee_id]
+        }
+    
+    if pending:
+        raise RuntimeError(f"Could not update rolling metrics for {len(pending)} employees after {ROLLING_UPDATE_MAX_ATTEMPTS} attempts")
+
+async def rebuild_rolling_metrics():
+    """Rebuild rolling metrics for every employee by streaming all stored records"""
+    states: Dict[str, Dict] = {}
+    batch: List[AttendanceRecord] = []
+    
+    async def fold(batch_records: List[AttendanceRecord]):
+        records_by_employee: Dict[str, List[AttendanceRecord]] = {}
+        for record in batch_records:
+            records_by_employee.setdefault(record.employee_id, []).append(record)
+        for employee_id, employee_records in records_by_employee.items():
+            states[employee_id] = apply_records_to_rolling_state(states.get(employee_id), employee_records)
+    
+    cursor = db.attendance_records.find({}, {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+    async for doc in cursor:
+        batch.append(AttendanceRecord(**doc))
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            await fold(batch)
+            batch = []
+    await fold(batch)
+    
+    await db.rolling_metrics.delete_many({})
+    if states:
+        await db.rolling_metrics.insert_many([
+            {"employee_id": employee_id, **state, "metrics": summarize_rolling_state(state), "revision": uuid.uuid4().hex}
+            for employee_id, state in states.items()
+        ])
+
+def bump_attendance_data_version():
+    """Mark employee/attendance data as changed"""
+    global attendance_data_version
+    attendance_data_version += 1
+
+async def get_current_analysis_id() -> Optional[str]:
+    """Return the id of the published analysis result set, or None if there is none"""
+    metadata = await db.analysis_metadata.find_one({"_id": "latest"}, {"analysis_id": 1})
+    return metadata["analysis_id"] if metadata else None
+
+async def store_attendance_policy(policy: AttendancePolicy):
+    """Remember the policy stored records were classified with"""
+    await db.settings.replace_one(
+        {"_id": "attendance_policy"},
+        {"_id": "attendance_policy", **policy.dict()},
+        upsert=True
+    )
+
+async def load_attendance_policy() -> AttendancePolicy:
+    """Return the active attendance policy, or the default if none has been stored"""
+    doc = await db.settings.find_one({"_id": "attendance_policy"}, {"_id": 0})
+    return AttendancePolicy(**doc) if doc else AttendancePolicy()
+
+async def sync_employee_id_counter(reset: bool = False):
+    """Align the employee ID counter with the highest numeric EMP ID stored.
+    
+    By default the counter only moves forward; reset=True is for when the
+    employees collection has just been replaced wholesale.
+    """
+    pipeline = [
+        {"$match": {"employee_id": {"$regex": r"^EMP\d+$"}}},
+        {"$group": {"_id": None, "highest": {"$max": {"$toLong": {"$substrCP": ["$employee_id", 3, 18]}}}}}
+    ]
+    result = await db.employees.aggregate(pipeline).to_list(length=1)
+    highest = result[0]["highest"] if result else 0
+    
+    update = {"$set": {"seq": highest}} if reset else {"$max": {"seq": highest}}
+    await db.counters.update_one({"_id": "employee_id"}, update, upsert=True)
+
+async def allocate_employee_ids(count: int) -> List[str]:
+    """Atomically allocate a contiguous block of new employee IDs.
+    
+    The counter is never created by the increment itself; if it is missing
+    (e.g. startup could not reach the database) it is first seeded from the
+    highest stored ID so allocation never restarts at EMP001.
+    """
+    if count <= 0:
+        return []
+    
+    counter = None
+    while counter is None:
+        counter = await db.counters.find_one_and_update(
+            {"_id": "employee_id"},
+            {"$inc": {"seq": count}},
+            return_document=ReturnDocument.AFTER
+        )
+        if counter is None:
+            await sync_employee_id_counter()
+    last_num = counter["seq"]
+    return [f"EMP{num:03d}" for num in range(last_num - count + 1, last_num + 1)]
+
 async def generate_next_employee_id() -> str:
     """Generate the next employee ID"""
-    # Get the highest employee ID
-    employees_cursor = db.employees.find({}, {"employee_id": 1}).sort("employee_id", -1).limit(1)
-    employees_list = await employees_cursor.to_list(length=1)
-    
-    if not employees_list:
-        return "EMP001"
+    return (await allocate_employee_ids(1))[0]
+
+async def delete_attendance_records_in_batches(employee_ids: List[str], cutoff_id):
+    """Delete attendance records for the given employees in bounded batches.
     
-    last_id = employees_list[0]["employee_id"]
-    # Extract number and increment
+    Only records with _id <= cutoff_id are removed, so records loaded later for
+    a reused employee ID (e.g. by sample data or an upload) are left alone.
+    """
+    deleted = 0
     try:
-        last_num = int(last_id.replace("EMP", ""))
-        next_num = last_num + 1
-        return f"EMP{next_num:03d}"
-    except:
-        return "EMP001"
+        for start in range(0, len(employee_ids), BULK_DELETE_BATCH_SIZE):
+            id_chunk = employee_ids[start:start + BULK_DELETE_BATCH_SIZE]
+            while True:
+                # Fetch a bounded set of record ids so each delete stays small
+                batch = await db.attendance_records.find(
+                    {"employee_id": {"$in": id_chunk}, "_id": {"$lte": cutoff_id}}, {"_id": 1}
+                ).limit(BULK_DELETE_BATCH_SIZE).to_list(length=BULK_DELETE_BATCH_SIZE)
+                if not batch:
+                    break
+                result = await db.attendance_records.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+                deleted += result.deleted_count
+                bump_attendance_data_version()
+        logger.info(f"Deleted {deleted} attendance records for {len(employee_ids)} employees")
+    except Exception as e:
+        logger.error(f"Error deleting attendance records: {str(e)}")
+
+async def run_attendance_analysis(threshold: float, data_version: int) -> Dict:
+    """Compute and store attendance analysis results for all employees.
+    
+    Results are only stored if no analysis of newer data has been stored meanwhile.
+    """
+    global stored_analysis_version
+    
+    # Get employees and attendance records from database
+    employees_cursor = db.employees.find({})
+    employees_list = await employees_cursor.to_list(length=None)
+    
+    records_cursor = db.attendance_records.find({})
+    records_list = await records_cursor.to_list(length=None)
+    
+    if not employees_list or not records_list:
+        raise HTTPException(status_code=404, detail="No attendance data found. Please generate sample data first.")
+    
+    # Convert to Pydantic models
+    employees = [Employee(**emp) for emp in employees_list]
+    records = [AttendanceRecord(**rec) for rec in records_list]
+    
+    analysis_results = []
+    
+    # Analyze each employee
+    for employee in employees:
+        # Calculate basic metrics
+        metrics = calculate_attendance_metrics(employee, records, threshold)
+        
+        # Create analysis result
+        result = AnalysisResult(
+            employee_id=employee.employee_id,
+            name=employee.name,
+            department=employee.department,
+            total_days=metrics["total_days"],
+            present_days=metrics["present_days"],
+            absent_days=metrics["absent_days"],
+            late_days=metrics["late_days"],
+            half_days=metrics["half_days"],
+            attendance_percentage=metrics["attendance_percentage"],
+            status=metrics["status"],
+            attendance_threshold=threshold
+        )
+        
+        analysis_results.append(result)
+    
+    # Store analysis results; the lock keeps this worker from storing an older analysis over a newer one
+    analysis_id = None
+    analysis_timestamp = datetime.now().isoformat()
+    async with analysis_write_lock:
+        if data_version < stored_analysis_version:
+            logger.info(f"Skipping storage of analysis for data version {data_version}; version {stored_analysis_version} is already stored")
+        else:
+            # Insert the new set alongside the current one, then switch the pointer readers follow,
+            # so no worker ever reads an empty or mixed set
+            new_analysis_id = uuid.uuid4().hex
+            result_docs = [{**result.dict(), "analysis_id": new_analysis_id} for result in analysis_results]
+            await db.analysis_results.insert_many(result_docs)
+            previous = await db.analysis_metadata.find_one_and_replace(
+                {"_id": "latest"},
+                {"analysis_id": new_analysis_id, "attendance_threshold": threshold, "analysis_timestamp": analysis_timestamp},
+                upsert=True
+            )
+            analysis_id = new_analysis_id
+            stored_analysis_version = data_version
+            threshold_sweep_cache["analysis_id"] = analysis_id
+            threshold_sweep_cache["percentages"] = sorted(r.attendance_percentage for r in analysis_results)
+            
+            # Only the set that was just replaced is removed; a set another worker is about to publish stays.
+            # None also matches results stored before they were tagged.
+            previous_id = previous["analysis_id"] if previous else None
+            await db.analysis_results.delete_many({"analysis_id": {"$in": [previous_id, None]}})
+    
+    # Calculate summary statistics
+    total_employees = len(analysis_results)
+    meeting_threshold = len([r for r in analysis_results if r.status == "meets_threshold"])
+    below_threshold = total_employees - meeting_threshold
+    
+    avg_attendance = sum(r.attendance_percentage for r in analysis_results) / total_employees if total_employees > 0 else 0
+    
+    return {
+        "message": "Attendance analysis completed successfully",
+        "summary": {
+            "total_employees": total_employees,
+            "attendance_threshold": threshold,
+            "meeting_threshold": meeting_threshold,
+            # Deprecated: kept for older clients, use meeting_threshold
+            "meeting_70_percent_threshold": meeting_threshold,
+            "below_threshold": below_threshold,
+            "average_attendance_rate": round(avg_attendance, 1),
+            "analysis_id": analysis_id,
+            "results_stored": analysis_id is not None,
+            "analysis_timestamp": analysis_timestamp
+        },
+        "detailed_results": [result.dict() for result in analysis_results]
+    }
+
+class ParquetStreamSink(io.RawIOBase):
+    """Write-only sink that lets a Parquet writer be drained chunk by chunk"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+async def stream_csv_export(cursor, columns: Dict[str, str]):
+    """Stream cursor documents as CSV, flushing once per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(list(columns))
+    
+    rows_in_batch = 0
+    async for doc in cursor:
+        writer.writerow([doc.get(column) for column in columns])
+        rows_in_batch += 1
+        if rows_in_batch >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows_in_batch = 0
+    
+    yield buffer.getvalue()
+
+async def stream_parquet_export(cursor, columns: Dict[str, str]):
+    """Stream cursor documents as Parquet, writing one row group per batch"""
+    arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    schema = pa.schema([(column, arrow_types[column_type]) for column, column_type in columns.items()])
+    sink = ParquetStreamSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    
+    def empty_batch():
+        return {column: [] for column in columns}
+    
+    batch = empty_batch()
+    rows_in_batch = 0
+    async for doc in cursor:
+        for column in columns:
+            batch[column].append(doc.get(column))
+        rows_in_batch += 1
+        if rows_in_batch >= EXPORT_BATCH_SIZE:
+            writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+            yield sink.drain()
+            batch = empty_batch()
+            rows_in_batch = 0
+    
+    if rows_in_batch:
+        writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+def validate_export_date(value: Optional[str], name: str) -> Optional[str]:
+    """Reject anything but a real YYYY-MM-DD date, since dates are compared as strings"""
+    if value is None:
+        return None
+    if not is_valid_record_date(value):
+        raise HTTPException(status_code=400, detail=f"{name} must be a valid date in YYYY-MM-DD format")
+    return value
+
+def build_export_response(cursor, columns: Dict[str, str], export_format: str, filename: str) -> StreamingResponse:
+    """Wrap a cursor in a streaming CSV or Parquet download"""
+    if export_format == "parquet":
+        if pa is None:
+            raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+        content = stream_parquet_export(cursor, columns)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        content = stream_csv_export(cursor, columns)
+        media_type = "text/csv"
+    
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
 
 # API Routes
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "service": "Attendance Management System"}
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Report whether the database is reachable, with latency and pool usage"""
+    pool = pool_monitor.snapshot(MONGO_MAX_POOL_SIZE)
+    
+    start_time = time.perf_counter()
+    try:
+        await client.admin.command("ping")
+    except Exception as e:
+        logger.error(f"Readiness check failed: {str(e)}")
+        return JSONResponse(status_code=503, content={
+            "status": "unavailable",
+            "database": {"reachable": False, "error": str(e)},
+            "pool": pool,
+            "startup": startup_metrics
+        })
+    
+    return {
+        "status": "ready",
+        "database": {"reachable": True, "latency_ms": round((time.perf_counter() - start_time) * 1000, 2)},
+        "pool": pool,
+        "startup": startup_metrics
+    }
+
 @app.get("/api/sample-data")
 async def get_sample_data():
     """Get sample attendance data for demonstration"""
@@ -247,17 +1054,26 @@ async def get_sample_data():
         sample_data = generate_sample_data()
         
         # Store sample data in database
+        bump_attendance_data_version()
         await db.employees.delete_many({})
         await db.attendance_records.delete_many({})
         await db.analysis_results.delete_many({})
+        await db.analysis_metadata.delete_many({})
+        await db.rolling_metrics.delete_many({})
         
         # Insert employees
         employee_docs = [emp.dict() for emp in sample_data.employees]
         await db.employees.insert_many(employee_docs)
+        await sync_employee_id_counter(reset=True)
+        
+        # Sample records are classified with the default policy
+        await store_attendance_policy(AttendancePolicy())
         
         # Insert attendance records
         record_docs = [rec.dict() for rec in sample_data.attendance_records]
         await db.attendance_records.insert_many(record_docs)
+        await update_rolling_metrics(sample_data.attendance_records)
+        bump_attendance_data_version()
         
         return {
             "message": "Sample data generated successfully",
@@ -293,7 +1109,9 @@ async def add_employee(employee_data: NewEmployee):
         )
         
         # Insert into database
+        bump_attendance_data_version()
         await db.employees.insert_one(new_employee.dict())
+        bump_attendance_data_version()
         
         return {
             "message": "Employee added successfully",
@@ -306,6 +1124,108 @@ async def add_employee(employee_data: NewEmployee):
         logger.error(f"Error adding employee: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/employees/bulk-add")
+async def bulk_add_employees(payload: BulkEmployeeCreate):
+    """Add many employees at once, reporting the outcome for each item"""
+    try:
+        results = [None] * len(payload.employees)
+        
+        # Reject duplicate emails within the request itself
+        seen_emails = set()
+        candidates = []
+        for index, employee_data in enumerate(payload.employees):
+            if employee_data.email in seen_emails:
+                results[index] = {"index": index, "email": employee_data.email, "status": "error", "detail": "Duplicate email in request"}
+                continue
+            seen_emails.add(employee_data.email)
+            candidates.append((index, employee_data))
+        
+        # Check all emails against the database in a single query
+        existing_cursor = db.employees.find({"email": {"$in": list(seen_emails)}}, {"email": 1})
+        existing_emails = {doc["email"] for doc in await existing_cursor.to_list(length=None)}
+        
+        accepted = []
+        for index, employee_data in candidates:
+            if employee_data.email in existing_emails:
+                results[index] = {"index": index, "email": employee_data.email, "status": "error", "detail": "Employee with this email already exists"}
+            else:
+                accepted.append((index, employee_data))
+        
+        # Allocate one block of IDs and write everything in one batch
+        employee_ids = await allocate_employee_ids(len(accepted))
+        new_employees = [
+            Employee(employee_id=employee_id, **employee_data.dict())
+            for employee_id, (_, employee_data) in zip(employee_ids, accepted)
+        ]
+        write_errors = {}
+        if new_employees:
+            bump_attendance_data_version()
+            try:
+                await db.employees.insert_many([emp.dict() for emp in new_employees], ordered=False)
+            except BulkWriteError as e:
+                # Unordered inserts keep going, so only the reported rows failed
+                write_errors = {error["index"]: error for error in e.details["writeErrors"]}
+            bump_attendance_data_version()
+        
+        for position, ((index, _), new_employee) in enumerate(zip(accepted, new_employees)):
+            if position in write_errors:
+                error = write_errors[position]
+                detail = "Employee already exists" if error["code"] == 11000 else error["errmsg"]
+                results[index] = {"index": index, "email": new_employee.email, "status": "error", "detail": detail}
+            else:
+                results[index] = {"index": index, "email": new_employee.email, "status": "created", "employee_id": new_employee.employee_id}
+        
+        created_count = len(new_employees) - len(write_errors)
+        return {
+            "message": f"{created_count} of {len(results)} employees added successfully",
+            "created_count": created_count,
+            "failed_count": len(results) - created_count,
+            "results": results
+        }
+        
+    except Exception as e:
+        logger.error(f"Error bulk adding employees: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/employees/bulk-delete")
+async def bulk_delete_employees(payload: BulkEmployeeDelete, background_tasks: BackgroundTasks):
+    """Delete many employees at once; their attendance records are removed in the background"""
+    try:
+        requested_ids = list(dict.fromkeys(payload.employee_ids))
+        
+        # Find which employees exist in a single query
+        existing_cursor = db.employees.find({"employee_id": {"$in": requested_ids}}, {"employee_id": 1})
+        existing_ids = {doc["employee_id"] for doc in await existing_cursor.to_list(length=None)}
+        deleted_ids = [employee_id for employee_id in requested_ids if employee_id in existing_ids]
+        
+        if deleted_ids:
+            # Records inserted after this point belong to whoever reuses these IDs
+            latest_record = await db.attendance_records.find({}, {"_id": 1}).sort("_id", -1).limit(1).to_list(length=1)
+            
+            bump_attendance_data_version()
+            await db.employees.delete_many({"employee_id": {"$in": deleted_ids}})
+            await db.rolling_metrics.delete_many({"employee_id": {"$in": deleted_ids}})
+            bump_attendance_data_version()
+            if latest_record:
+                background_tasks.add_task(delete_attendance_records_in_batches, deleted_ids, latest_record[0]["_id"])
+        
+        results = [
+            {"employee_id": employee_id, "status": "deleted"} if employee_id in existing_ids
+            else {"employee_id": employee_id, "status": "error", "detail": "Employee not found"}
+            for employee_id in requested_ids
+        ]
+        
+        return {
+            "message": f"{len(deleted_ids)} of {len(requested_ids)} employees deleted successfully",
+            "deleted_count": len(deleted_ids),
+            "failed_count": len(requested_ids) - len(deleted_ids),
+            "results": results
+        }
+        
+    except Exception as e:
+        logger.error(f"Error bulk deleting employees: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/api/employees/{employee_id}")
 async def delete_employee(employee_id: str):
     """Delete an employee from the system"""
@@ -316,8 +1236,11 @@ async def delete_employee(employee_id: str):
             raise HTTPException(status_code=404, detail="Employee not found")
         
         # Delete employee and their attendance records
+        bump_attendance_data_version()
         await db.employees.delete_one({"employee_id": employee_id})
         await db.attendance_records.delete_many({"employee_id": employee_id})
+        await db.rolling_metrics.delete_one({"employee_id": employee_id})
+        bump_attendance_data_version()
         
         return {"message": f"Employee {employee_id} deleted successfully"}
         
@@ -328,75 +1251,34 @@ async def delete_employee(employee_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/analyze-attendance")
-async def analyze_attendance():
+async def analyze_attendance(threshold: float = Query(ATTENDANCE_THRESHOLD, ge=0, le=100)):
     """Analyze attendance data and generate reports"""
     try:
-        # Get employees and attendance records from database
-        employees_cursor = db.employees.find({})
-        employees_list = await employees_cursor.to_list(length=None)
-        
-        records_cursor = db.attendance_records.find({})
-        records_list = await records_cursor.to_list(length=None)
-        
-        if not employees_list or not records_list:
-            raise HTTPException(status_code=404, detail="No attendance data found. Please generate sample data first.")
-        
-        # Convert to Pydantic models
-        employees = [Employee(**emp) for emp in employees_list]
-        records = [AttendanceRecord(**rec) for rec in records_list]
-        
-        analysis_results = []
-        
-        # Analyze each employee
-        for employee in employees:
-            # Calculate basic metrics
-            metrics = calculate_attendance_metrics(employee, records)
+        # Concurrent requests over the same data version and parameters share one computation
+        data_version = attendance_data_version
+        key = (data_version, threshold)
+        task = inflight_analyses.get(key)
+        if task is None:
+            task = asyncio.create_task(run_attendance_analysis(threshold, data_version))
+            inflight_analyses[key] = task
             
-            # Create analysis result
-            result = AnalysisResult(
-                employee_id=employee.employee_id,
-                name=employee.name,
-                department=employee.department,
-                total_days=metrics["total_days"],
-                present_days=metrics["present_days"],
-                absent_days=metrics["absent_days"],
-                late_days=metrics["late_days"],
-                attendance_percentage=metrics["attendance_percentage"],
-                status=metrics["status"]
-            )
+            def release(finished_task, key=key):
+                if inflight_analyses.get(key) is finished_task:
+                    del inflight_analyses[key]
             
-            analysis_results.append(result)
-        
-        # Store analysis results
-        await db.analysis_results.delete_many({})
-        result_docs = [result.dict() for result in analysis_results]
-        await db.analysis_results.insert_many(result_docs)
-        
-        # Calculate summary statistics
-        total_employees = len(analysis_results)
-        meeting_threshold = len([r for r in analysis_results if r.status == "meets_threshold"])
-        below_threshold = total_employees - meeting_threshold
+            task.add_done_callback(release)
         
-        avg_attendance = sum(r.attendance_percentage for r in analysis_results) / total_employees if total_employees > 0 else 0
-        
-        return {
-            "message": "Attendance analysis completed successfully",
-            "summary": {
-                "total_employees": total_employees,
-                "meeting_70_percent_threshold": meeting_threshold,
-                "below_threshold": below_threshold,
-                "average_attendance_rate": round(avg_attendance, 1),
-                "analysis_timestamp": datetime.now().isoformat()
-            },
-            "detailed_results": [result.dict() for result in analysis_results]
-        }
+        # Shield so one client disconnecting does not cancel the shared computation
+        return await asyncio.shield(task)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing attendance: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/employees")
-async def get_all_employees():
+async def get_all_employees(threshold: float = Query(ATTENDANCE_THRESHOLD, ge=0, le=100)):
     """Get all employees with their attendance summaries"""
     try:
         # Get employees and attendance records from database
@@ -413,12 +1295,16 @@ async def get_all_employees():
         employees = [Employee(**emp) for emp in employees_list]
         records = [AttendanceRecord(**rec) for rec in records_list]
         
+        # Rolling metrics are maintained as records arrive, so they are read rather than computed
+        rolling_cursor = db.rolling_metrics.find({}, {"employee_id": 1, "metrics": 1})
+        rolling_metrics = {doc["employee_id"]: doc["metrics"] for doc in await rolling_cursor.to_list(length=None)}
+        
         # Calculate attendance summary for each employee
         employee_summaries = []
         
         for employee in employees:
             # Calculate basic metrics
-            metrics = calculate_attendance_metrics(employee, records)
+            metrics = calculate_attendance_metrics(employee, records, threshold)
             
             # Get recent attendance pattern (last 7 days)
             recent_records = [r for r in records if r.employee_id == employee.employee_id]
@@ -427,7 +1313,7 @@ async def get_all_employees():
             
             if recent_records:
                 recent_7_days = recent_records[:7]
-                present_recent = len([r for r in recent_7_days if r.status in ["present", "late"]])
+                present_recent = attendance_credit([r.status for r in recent_7_days])
                 if present_recent >= 6:
                     recent_status = "Excellent"
                 elif present_recent >= 5:
@@ -448,10 +1334,12 @@ async def get_all_employees():
                 "present_days": metrics["present_days"],
                 "absent_days": metrics["absent_days"],
                 "late_days": metrics["late_days"],
+                "half_days": metrics["half_days"],
                 "attendance_percentage": round(metrics["attendance_percentage"], 1),
                 "status": metrics["status"],
                 "recent_status": recent_status,
-                "avg_hours": round(metrics["avg_hours"], 1)
+                "avg_hours": round(metrics["avg_hours"], 1),
+                "rolling_metrics": rolling_metrics.get(employee.employee_id)
             })
         
         # Sort by attendance percentage (descending)
@@ -459,6 +1347,7 @@ async def get_all_employees():
         
         return {
             "total_employees": len(employee_summaries),
+            "attendance_threshold": threshold,
             "employees": employee_summaries
         }
         
@@ -466,13 +1355,39 @@ async def get_all_employees():
         logger.error(f"Error getting employees: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/employees/{employee_id}/trends")
+async def get_employee_trends(employee_id: str):
+    """Get rolling attendance, absence streak and lateness trend metrics for an employee"""
+    try:
+        employee = await db.employees.find_one({"employee_id": employee_id}, {"_id": 0})
+        if not employee:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        
+        rolling_state = await db.rolling_metrics.find_one({"employee_id": employee_id}, {"metrics": 1})
+        
+        return {
+            "employee_id": employee_id,
+            "name": employee["name"],
+            "department": employee["department"],
+            "rolling_metrics": rolling_state["metrics"] if rolling_state else None
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting employee trends: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/attendance-report")
 async def get_attendance_report():
     """Get the latest attendance analysis report"""
     try:
-        # Get analysis results from database
-        results_cursor = db.analysis_results.find({})
-        results_list = await results_cursor.to_list(length=None)
+        # Get the published analysis results from database
+        analysis_id = await get_current_analysis_id()
+        results_list = []
+        if analysis_id:
+            results_cursor = db.analysis_results.find({"analysis_id": analysis_id})
+            results_list = await results_cursor.to_list(length=None)
         
         if not results_list:
             return {"message": "No analysis results found. Please run attendance analysis first.", "results": []}
@@ -491,6 +1406,9 @@ async def get_attendance_report():
         return {
             "summary": {
                 "total_employees": total_employees,
+                "attendance_threshold": results_list[0].get("attendance_threshold", ATTENDANCE_THRESHOLD),
+                "meeting_threshold": meeting_threshold,
+                # Deprecated: kept for older clients, use meeting_threshold
                 "meeting_70_percent_threshold": meeting_threshold,
                 "below_threshold": below_threshold,
                 "average_attendance_rate": round(avg_attendance, 1)
@@ -502,21 +1420,104 @@ async def get_attendance_report():
         logger.error(f"Error getting attendance report: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/analysis/threshold-sweep")
+async def threshold_sweep(thresholds: Optional[List[float]] = Query(None)):
+    """Count employees meeting each of many thresholds from the latest analysis"""
+    try:
+        if thresholds is None:
+            thresholds = [float(t) for t in range(0, 101, 5)]
+        
+        # Same bounds as the analyze endpoint; the comparison is false for nan, so it is rejected too
+        invalid = [t for t in thresholds if not 0 <= t <= 100]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Thresholds must be between 0 and 100: {invalid}")
+        
+        # A single lookup by _id tells us whether the cached percentages are current
+        metadata = await db.analysis_metadata.find_one({"_id": "latest"})
+        if not metadata:
+            return {"message": "No analysis results found. Please run attendance analysis first.", "results": []}
+        
+        if threshold_sweep_cache["analysis_id"] != metadata["analysis_id"]:
+            results_cursor = db.analysis_results.find({"analysis_id": metadata["analysis_id"]}, {"attendance_percentage": 1})
+            results_list = await results_cursor.to_list(length=None)
+            threshold_sweep_cache["analysis_id"] = metadata["analysis_id"]
+            threshold_sweep_cache["percentages"] = sorted(r["attendance_percentage"] for r in results_list)
+        
+        percentages = threshold_sweep_cache["percentages"]
+        start_time = time.perf_counter()
+        sweep = sweep_attendance_thresholds(percentages, thresholds)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        
+        return {
+            "analysis_id": metadata["analysis_id"],
+            "analysis_threshold": metadata["attendance_threshold"],
+            "total_employees": len(percentages),
+            "results": sweep,
+            "computation_time_ms": round(elapsed_ms, 4)
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error running threshold sweep: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/upload-attendance")
 async def upload_attendance_data(data: AttendanceData):
     """Upload custom attendance data for analysis"""
     try:
+        policy = AttendancePolicy(
+            work_hours_start=data.work_hours_start,
+            work_hours_end=data.work_hours_end,
+            late_threshold_minutes=data.late_threshold_minutes
+        )
+        try:
+            resolve_attendance_policy(policy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Reject bad dates before anything is cleared, since rolling metrics parse them
+        invalid_dates = [index for index, record in enumerate(data.attendance_records) if not is_valid_record_date(record.date)]
+        if invalid_dates:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Attendance record dates must be valid dates in YYYY-MM-DD format (invalid records at indexes {invalid_dates[:20]})"
+            )
+        
+        # The unique (employee_id, date) index would otherwise fail the insert after the old data is gone
+        seen_days = set()
+        duplicate_days = []
+        for index, record in enumerate(data.attendance_records):
+            day = (record.employee_id, record.date)
+            if day in seen_days:
+                duplicate_days.append(index)
+            seen_days.add(day)
+        if duplicate_days:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Each employee can only have one attendance record per date (duplicate records at indexes {duplicate_days[:20]})"
+            )
+        
         # Clear existing data
+        bump_attendance_data_version()
         await db.employees.delete_many({})
         await db.attendance_records.delete_many({})
         await db.analysis_results.delete_many({})
+        await db.analysis_metadata.delete_many({})
+        await db.rolling_metrics.delete_many({})
         
         # Insert new data
         employee_docs = [emp.dict() for emp in data.employees]
         await db.employees.insert_many(employee_docs)
+        await sync_employee_id_counter(reset=True)
         
-        record_docs = [rec.dict() for rec in data.attendance_records]
+        # Derive status and hours from check-in/out times using the submitted policy
+        records = reclassify_attendance_records(data.attendance_records, policy)
+        await store_attendance_policy(policy)
+        record_docs = [rec.dict() for rec in records]
         await db.attendance_records.insert_many(record_docs)
+        await update_rolling_metrics(records)
+        bump_attendance_data_version()
         
         return {
             "message": "Attendance data uploaded successfully",
@@ -524,10 +1525,183 @@ async def upload_attendance_data(data: AttendanceData):
             "records_count": len(data.attendance_records)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading attendance data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/attendance-records")
+async def add_attendance_records(data: NewAttendanceRecords):
+    """Append attendance records and update rolling metrics incrementally, reporting the outcome for each item"""
+    try:
+        # Without an explicit policy, new records follow the one stored records were classified with
+        policy = data.policy if data.policy is not None else await load_attendance_policy()
+        try:
+            records = reclassify_attendance_records(data.attendance_records, policy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Look up known employees and already recorded days in one query each
+        employee_ids = list({record.employee_id for record in records})
+        employees_cursor = db.employees.find({"employee_id": {"$in": employee_ids}}, {"employee_id": 1})
+        known_employees = {doc["employee_id"] for doc in await employees_cursor.to_list(length=None)}
+        
+        existing_cursor = db.attendance_records.find(
+            {"employee_id": {"$in": employee_ids}, "date": {"$in": list({record.date for record in records})}},
+            {"employee_id": 1, "date": 1}
+        )
+        seen_days = {(doc["employee_id"], doc["date"]) for doc in await existing_cursor.to_list(length=None)}
+        
+        results = []
+        accepted = []
+        for index, record in enumerate(records):
+            day = (record.employee_id, record.date)
+            if not is_valid_record_date(record.date):
+                results.append({"index": index, "employee_id": record.employee_id, "date": record.date, "status": "error", "detail": "Date must be a valid date in YYYY-MM-DD format"})
+            elif record.employee_id not in known_employees:
+                results.append({"index": index, "employee_id": record.employee_id, "date": record.date, "status": "error", "detail": "Employee not found"})
+            elif day in seen_days:
+                results.append({"index": index, "employee_id": record.employee_id, "date": record.date, "status": "error", "detail": "Attendance already recorded for this date"})
+            else:
+                seen_days.add(day)
+                result = {"index": index, "employee_id": record.employee_id, "date": record.date, "status": "created"}
+                accepted.append((result, record))
+                results.append(result)
+        
+        inserted = []
+        if accepted:
+            bump_attendance_data_version()
+            write_errors = {}
+            try:
+                await db.attendance_records.insert_many([rec.dict() for _, rec in accepted], ordered=False)
+            except BulkWriteError as e:
+                # The unique (employee_id, date) index catches days recorded concurrently since the lookup above
+                write_errors = {error["index"]: error for error in e.details["writeErrors"]}
+            
+            for position, (result, record) in enumerate(accepted):
+                if position in write_errors:
+                    error = write_errors[position]
+                    detail = "Attendance already recorded for this date" if error["code"] == 11000 else error["errmsg"]
+                    result.update({"status": "error", "detail": detail})
+                else:
+                    inserted.append(record)
+            
+            await update_rolling_metrics(inserted)
+            bump_attendance_data_version()
+        
+        return {
+            "message": f"{len(inserted)} of {len(records)} attendance records added successfully",
+            "created_count": len(inserted),
+            "failed_count": len(records) - len(inserted),
+            "results": results
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error adding attendance records: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/reclassify-attendance")
+async def reclassify_attendance(policy: AttendancePolicy):
+    """Reapply an attendance policy to all stored records without re-uploading"""
+    try:
+        try:
+            pipeline = build_reclassification_pipeline(policy)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Only records with a check-in time are derived from the policy
+        bump_attendance_data_version()
+        result = await db.attendance_records.update_many(
+            {"check_in_time": {"$regex": TIME_PATTERN}},
+            pipeline
+        )
+        await store_attendance_policy(policy)
+        
+        # Statuses changed in place, so rolling windows must be rebuilt
+        await rebuild_rolling_metrics()
+        bump_attendance_data_version()
+        
+        return {
+            "message": "Attendance records reclassified successfully",
+            "matched_count": result.matched_count,
+            "modified_count": result.modified_count,
+            "policy": policy.dict()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reclassifying attendance: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/export/attendance-records")
+async def export_attendance_records(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    department: Optional[str] = None
+):
+    """Stream attendance records as CSV or Parquet, optionally filtered by date range and department"""
+    try:
+        start_date = validate_export_date(start_date, "start_date")
+        end_date = validate_export_date(end_date, "end_date")
+        if start_date and end_date and start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+        
+        query = {}
+        
+        # Dates are stored as YYYY-MM-DD strings, so range filters compare lexically
+        if start_date or end_date:
+            query["date"] = {}
+            if start_date:
+                query["date"]["$gte"] = start_date
+            if end_date:
+                query["date"]["$lte"] = end_date
+        
+        # Records carry no department, so resolve it to employee IDs first
+        if department:
+            employees_cursor = db.employees.find({"department": department}, {"employee_id": 1})
+            employee_ids = [doc["employee_id"] for doc in await employees_cursor.to_list(length=None)]
+            query["employee_id"] = {"$in": employee_ids}
+        
+        projection = {column: 1 for column in RECORD_EXPORT_COLUMNS}
+        projection["_id"] = 0
+        cursor = db.attendance_records.find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+        
+        return build_export_response(cursor, RECORD_EXPORT_COLUMNS, format, "attendance_records")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting attendance records: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/export/analysis-results")
+async def export_analysis_results(
+    format: str = Query("csv", pattern="^(csv|parquet)$"),
+    department: Optional[str] = None
+):
+    """Stream the latest analysis results as CSV or Parquet, optionally filtered by department"""
+    try:
+        query = {"analysis_id": await get_current_analysis_id()}
+        if department:
+            query["department"] = department
+        
+        projection = {column: 1 for column in RESULT_EXPORT_COLUMNS}
+        projection["_id"] = 0
+        cursor = db.analysis_results.find(query, projection).batch_size(EXPORT_BATCH_SIZE)
+        
+        return build_export_response(cursor, RESULT_EXPORT_COLUMNS, format, "analysis_results")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting analysis results: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/dashboard-stats")
 async def get_dashboard_stats():
     """Get dashboard statistics"""
@@ -535,10 +1709,11 @@ async def get_dashboard_stats():
         # Get counts from database
         employees_count = await db.employees.count_documents({})
         records_count = await db.attendance_records.count_documents({})
-        analysis_count = await db.analysis_results.count_documents({})
         
-        # Get recent analysis summary if available
-        recent_analysis = await db.analysis_results.find({}).to_list(length=None)
+        # Get the published analysis summary if available
+        analysis_id = await get_current_analysis_id()
+        recent_analysis = await db.analysis_results.find({"analysis_id": analysis_id}).to_list(length=None) if analysis_id else []
+        analysis_count = len(recent_analysis)
         
         stats = {
             "employees_count": employees_count,
@@ -553,6 +1728,7 @@ async def get_dashboard_stats():
             avg_attendance = sum(r["attendance_percentage"] for r in recent_analysis) / len(recent_analysis)
             
             stats.update({
+                "attendance_threshold": recent_analysis[0].get("attendance_threshold", ATTENDANCE_THRESHOLD),
                 "meeting_threshold": meeting_threshold,
                 "below_threshold": below_threshold,
                 "average_attendance": round(avg_attendance, 1)
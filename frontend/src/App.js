@@ -197,6 +197,9 @@ function App() {
     }
   };
 
+  // Labels follow the threshold the backend reports; 70% is its default
+  const formatThreshold = (threshold) => `${threshold ?? 70}%`;
+
   const getStatusColor = (status) => {
     return status === 'meets_threshold' ? 'text-green-600' : 'text-red-600';
   };
@@ -215,7 +218,7 @@ function App() {
       <div className="text-center bg-gradient-to-r from-blue-600 to-purple-600 text-white rounded-2xl p-8">
         <h1 className="text-4xl font-bold mb-4">Attendance Management System</h1>
         <p className="text-xl opacity-90 mb-6">
-          Manual attendance tracking system with 70% attendance threshold analysis for employee management
+          Manual attendance tracking system with configurable attendance threshold analysis for employee management
         </p>
         <div className="flex flex-wrap justify-center gap-4">
           <button
@@ -278,7 +281,7 @@ function App() {
               <div className="bg-white rounded-xl shadow-md p-6 border-l-4 border-yellow-500">
                 <div className="flex items-center justify-between">
                   <div>
-                    <p className="text-sm font-medium text-gray-600">Meeting 70% Threshold</p>
+                    <p className="text-sm font-medium text-gray-600">Meeting {formatThreshold(dashboardStats.attendance_threshold)} Threshold</p>
                     <p className="text-3xl font-bold text-gray-900">{dashboardStats.meeting_threshold}</p>
                   </div>
                   <div className="bg-yellow-100 p-3 rounded-full">
@@ -340,7 +343,7 @@ function App() {
         <h3 className="text-lg font-semibold text-blue-900 mb-3">How to Use</h3>
         <div className="space-y-2 text-blue-800">
           <p><strong>Step 1:</strong> Generate sample data to populate the system with 100 realistic employee records</p>
-          <p><strong>Step 2:</strong> Calculate attendance metrics with 70% threshold rules</p>
+          <p><strong>Step 2:</strong> Calculate attendance metrics against the attendance threshold</p>
           <p><strong>Step 3:</strong> Review detailed results and attendance summaries</p>
           <p><strong>Step 4:</strong> Browse employee directory and add new employees manually</p>
         </div>
@@ -393,7 +396,7 @@ function App() {
               <p className="text-2xl font-bold text-gray-900">{employeesData.total_employees}</p>
             </div>
             <div className="bg-white rounded-lg shadow-md p-4 border-l-4 border-green-500">
-              <h3 className="text-sm font-medium text-gray-600">Meeting 70% Threshold</h3>
+              <h3 className="text-sm font-medium text-gray-600">Meeting {formatThreshold(employeesData.attendance_threshold)} Threshold</h3>
               <p className="text-2xl font-bold text-green-600">
                 {employeesData.employees?.filter(emp => emp.status === 'meets_threshold').length || 0}
               </p>
@@ -450,8 +453,8 @@ function App() {
                 className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500"
               >
                 <option value="">All Status</option>
-                <option value="meets_threshold">Meets Threshold (≥70%)</option>
-                <option value="below_threshold">Below Threshold (&lt;70%)</option>
+                <option value="meets_threshold">Meets Threshold (≥{formatThreshold(employeesData.attendance_threshold)})</option>
+                <option value="below_threshold">Below Threshold (&lt;{formatThreshold(employeesData.attendance_threshold)})</option>
               </select>
             </div>
             <div className="flex items-end">
@@ -538,7 +541,7 @@ function App() {
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <span className={getStatusBadge(employee.status)}>
-                          {employee.status === 'meets_threshold' ? 'Meets' : 'Below'} 70%
+                          {employee.status === 'meets_threshold' ? 'Meets' : 'Below'} {formatThreshold(employeesData.attendance_threshold)}
                         </span>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap">
@@ -722,8 +725,8 @@ function App() {
               <p className="text-sm text-gray-600">Total Employees</p>
             </div>
             <div className="text-center">
-              <p className="text-2xl font-bold text-green-600">{analysisResults.summary.meeting_70_percent_threshold}</p>
-              <p className="text-sm text-gray-600">Meeting 70% Threshold</p>
+              <p className="text-2xl font-bold text-green-600">{analysisResults.summary.meeting_threshold}</p>
+              <p className="text-sm text-gray-600">Meeting {formatThreshold(analysisResults.summary.attendance_threshold)} Threshold</p>
             </div>
             <div className="text-center">
               <p className="text-2xl font-bold text-red-600">{analysisResults.summary.below_threshold}</p>
@@ -787,8 +790,8 @@ function App() {
                 </h4>
                 <p className="text-gray-700 leading-relaxed">
                   {result.status === 'meets_threshold' 
-                    ? `${result.name} meets the 70% attendance threshold with ${result.attendance_percentage.toFixed(1)}% attendance rate. Performance is satisfactory.`
-                    : `${result.name} is below the 70% attendance threshold with ${result.attendance_percentage.toFixed(1)}% attendance rate. Improvement needed.`
+                    ? `${result.name} meets the ${formatThreshold(result.attendance_threshold)} attendance threshold with ${result.attendance_percentage.toFixed(1)}% attendance rate. Performance is satisfactory.`
+                    : `${result.name} is below the ${formatThreshold(result.attendance_threshold)} attendance threshold with ${result.attendance_percentage.toFixed(1)}% attendance rate. Improvement needed.`
                   }
                 </p>
               </div>
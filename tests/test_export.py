@@ -0,0 +1,96 @@
+import asyncio
+import csv
+import io
+import os
+import sys
+
+import pyarrow.parquet as pq
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+from server import (  # noqa: E402
+    RECORD_EXPORT_COLUMNS,
+    stream_csv_export,
+    stream_parquet_export,
+    validate_export_date,
+)
+
+
+class FakeCursor:
+    """Async iterator standing in for a Motor cursor"""
+
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.docs:
+            raise StopAsyncIteration
+        return self.docs.pop(0)
+
+
+def make_records(count):
+    return [
+        {
+            "employee_id": f"EMP{i:03d}",
+            "date": "2024-01-01",
+            "check_in_time": "09:00" if i % 2 else None,
+            "check_out_time": "17:00" if i % 2 else None,
+            "status": "present" if i % 2 else "absent",
+            "hours_worked": 8.0 if i % 2 else 0.0,
+        }
+        for i in range(count)
+    ]
+
+
+def collect(stream):
+    async def drain():
+        return [chunk async for chunk in stream]
+    return asyncio.run(drain())
+
+
+def test_csv_export_flushes_once_per_batch(monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+
+    chunks = collect(stream_csv_export(FakeCursor(make_records(5)), RECORD_EXPORT_COLUMNS))
+
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO("".join(chunks))))
+    assert rows[0] == list(RECORD_EXPORT_COLUMNS)
+    assert rows[1] == ["EMP000", "2024-01-01", "", "", "absent", "0.0"]
+    assert rows[2] == ["EMP001", "2024-01-01", "09:00", "17:00", "present", "8.0"]
+    assert len(rows) == 6
+
+
+def test_parquet_export_writes_one_row_group_per_batch(monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+    records = make_records(5)
+
+    chunks = collect(stream_parquet_export(FakeCursor(records), RECORD_EXPORT_COLUMNS))
+
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+    assert parquet_file.metadata.num_row_groups == 3
+    assert [parquet_file.metadata.row_group(i).num_rows for i in range(3)] == [2, 2, 1]
+    assert parquet_file.read().to_pylist() == records
+
+
+def test_empty_parquet_export_is_a_valid_file():
+    chunks = collect(stream_parquet_export(FakeCursor([]), RECORD_EXPORT_COLUMNS))
+
+    table = pq.read_table(io.BytesIO(b"".join(chunks)))
+    assert table.num_rows == 0
+    assert table.column_names == list(RECORD_EXPORT_COLUMNS)
+
+
+def test_validate_export_date():
+    assert validate_export_date(None, "start_date") is None
+    assert validate_export_date("2024-02-29", "start_date") == "2024-02-29"
+    for value in ["2024-2-01", "2023-02-29", "2024-13-01", "01/15/2024", "2024-01-01T00:00", ""]:
+        with pytest.raises(HTTPException) as error:
+            validate_export_date(value, "start_date")
+        assert error.value.status_code == 400
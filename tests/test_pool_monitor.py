@@ -0,0 +1,46 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from server import ConnectionPoolMonitor  # noqa: E402
+
+PRIMARY = ("db-0", 27017)
+SECONDARY = ("db-1", 27017)
+
+
+def test_saturation_is_per_server():
+    monitor = ConnectionPoolMonitor()
+    for address, busy in [(PRIMARY, 8), (SECONDARY, 3)]:
+        for _ in range(busy):
+            monitor.connection_created(SimpleNamespace(address=address))
+            monitor.connection_checked_out(SimpleNamespace(address=address))
+
+    pool = monitor.snapshot(max_pool_size=10)
+
+    assert pool["checked_out_connections"] == 11
+    assert pool["saturation"] == 0.8
+    assert pool["servers"]["db-1:27017"] == {"open_connections": 3, "checked_out_connections": 3}
+
+
+def test_counters_survive_concurrent_events():
+    monitor = ConnectionPoolMonitor()
+    event = SimpleNamespace(address=PRIMARY)
+
+    def churn():
+        for _ in range(10000):
+            monitor.connection_checked_out(event)
+            monitor.connection_checked_in(event)
+            monitor.connection_check_out_failed(event)
+
+    threads = [threading.Thread(target=churn) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    pool = monitor.snapshot(max_pool_size=10)
+    assert pool["checked_out_connections"] == 0
+    assert pool["checkout_failures"] == 80000
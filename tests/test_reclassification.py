@@ -0,0 +1,172 @@
+import os
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from server import (  # noqa: E402
+    TIME_PATTERN,
+    AttendancePolicy,
+    AttendanceRecord,
+    Employee,
+    build_reclassification_pipeline,
+    calculate_attendance_metrics,
+    parse_time_minutes,
+    reclassify_attendance_records,
+)
+
+
+def evaluate(expr, doc):
+    """Evaluate the subset of MongoDB aggregation expressions used by the pipeline"""
+    if isinstance(expr, str) and expr.startswith("$"):
+        return doc.get(expr[1:])
+    if isinstance(expr, list):
+        return [evaluate(e, doc) for e in expr]
+    if not isinstance(expr, dict):
+        return expr
+
+    (op, args), = expr.items()
+    if op == "$cond":
+        condition, then, otherwise = args
+        return evaluate(then if evaluate(condition, doc) else otherwise, doc)
+    if op == "$switch":
+        for branch in args["branches"]:
+            if evaluate(branch["case"], doc):
+                return evaluate(branch["then"], doc)
+        return evaluate(args["default"], doc)
+    if op == "$convert":
+        value = evaluate(args["input"], doc)
+        if value is None:
+            return args["onNull"]
+        if isinstance(value, str) and re.fullmatch(r"-?[0-9]+", value):
+            return int(value)
+        return args["onError"]
+    if op == "$regexMatch":
+        return re.search(args["regex"], evaluate(args["input"], doc)) is not None
+
+    values = evaluate(args, doc)
+    if op == "$ifNull":
+        return values[0] if values[0] is not None else values[1]
+    if op == "$split":
+        return None if values[0] is None else values[0].split(values[1])
+    if op == "$arrayElemAt":
+        array, index = values
+        return None if array is None or index >= len(array) else array[index]
+    if op in ("$add", "$multiply", "$subtract", "$divide", "$round") and None in values:
+        return None
+    if op == "$add":
+        return sum(values)
+    if op == "$multiply":
+        return values[0] * values[1]
+    if op == "$subtract":
+        return values[0] - values[1]
+    if op == "$divide":
+        return values[0] / values[1]
+    if op == "$round":
+        return round(values[0], values[1])
+    if op == "$max":
+        return max(v for v in values if v is not None)
+    if op == "$and":
+        return all(values)
+    if op == "$not":
+        return not values[0]
+    if op == "$eq":
+        return values[0] == values[1]
+    if op == "$ne":
+        return values[0] != values[1]
+    # BSON ordering puts null below every number
+    if op == "$lt":
+        return values[1] is not None and (values[0] is None or values[0] < values[1])
+    if op == "$gt":
+        return values[0] is not None and (values[1] is None or values[0] > values[1])
+    raise NotImplementedError(op)
+
+
+def apply_pipeline(pipeline, doc):
+    if not re.search(TIME_PATTERN, doc.get("check_in_time") or ""):
+        return doc
+    doc = dict(doc)
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$set":
+            doc.update({field: evaluate(expr, doc) for field, expr in spec.items()})
+        elif name == "$unset":
+            for field in spec:
+                doc.pop(field, None)
+    return doc
+
+
+RECORDS = [
+    AttendanceRecord(employee_id="EMP001", date="2024-01-01", check_in_time="08:55", check_out_time="17:05", status="absent"),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-02", check_in_time="09:30", check_out_time="17:30", status="present"),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-03", check_in_time="09:31", check_out_time="17:30", status="present"),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-04", check_in_time="09:00", check_out_time="12:00", status="present", hours_worked=8),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-05", check_in_time="10:15", status="present", hours_worked=6.5),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-06", check_in_time="12:30 PM", check_out_time="17:00", status="present", hours_worked=4.5),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-07", check_in_time="09:00", check_out_time="5:00 PM", status="late", hours_worked=7),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-08", check_in_time="09:00:00", check_out_time="17:00:00", status="present", hours_worked=8),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-09", check_in_time="09:00\n", check_out_time="17:00", status="present", hours_worked=8),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-10", status="absent"),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-11", check_in_time="18:00", check_out_time="17:00", status="present"),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-12", check_in_time="25:10", check_out_time="17:00", status="present", hours_worked=8),
+    AttendanceRecord(employee_id="EMP001", date="2024-01-13", check_in_time="09:00", check_out_time="17:75", status="late", hours_worked=7),
+]
+
+
+def test_parse_time_minutes_accepts_only_hh_mm():
+    assert parse_time_minutes("09:05") == 545
+    assert parse_time_minutes("9:05") == 545
+    assert parse_time_minutes("23:59") == 1439
+    for value in [None, "", "12:30 PM", "09:00:00", "09:00\n", " 9:00", "9", "99:99", "24:00", "12:60", "9:5", "123:00"]:
+        assert parse_time_minutes(value) is None
+
+
+def test_reclassify_applies_policy():
+    policy = AttendancePolicy(work_hours_start="09:00", work_hours_end="17:00", late_threshold_minutes=30)
+    results = {r.date: r for r in reclassify_attendance_records(RECORDS, policy)}
+
+    assert results["2024-01-01"].status == "present"
+    assert results["2024-01-02"].status == "present"
+    assert results["2024-01-03"].status == "late"
+    assert (results["2024-01-04"].status, results["2024-01-04"].hours_worked) == ("half_day", 3.0)
+    assert (results["2024-01-05"].status, results["2024-01-05"].hours_worked) == ("late", 6.5)
+    assert (results["2024-01-06"].status, results["2024-01-06"].hours_worked) == ("present", 4.5)
+    assert results["2024-01-10"].status == "absent"
+
+
+@pytest.mark.parametrize("policy", [
+    AttendancePolicy(),
+    AttendancePolicy(work_hours_start="08:00", work_hours_end="18:00", late_threshold_minutes=0),
+    AttendancePolicy(work_hours_start="10:00", work_hours_end="14:00", late_threshold_minutes=45),
+])
+def test_pipeline_matches_python_reclassification(policy):
+    python_results = reclassify_attendance_records(RECORDS, policy)
+    pipeline = build_reclassification_pipeline(policy)
+
+    for record, expected in zip(RECORDS, python_results):
+        actual = apply_pipeline(pipeline, record.dict())
+        assert (actual["status"], actual["hours_worked"]) == (expected.status, expected.hours_worked), record.date
+        assert "_checkin_minutes" not in actual
+
+
+def test_invalid_policy_is_rejected():
+    with pytest.raises(ValueError):
+        build_reclassification_pipeline(AttendancePolicy(work_hours_start="17:00", work_hours_end="09:00"))
+
+
+def test_half_day_counts_as_half_attendance():
+    employee = Employee(employee_id="EMP001", name="A", department="HR", position="P", email="a@x.com", phone="1")
+    records = [
+        AttendanceRecord(employee_id="EMP001", date="2024-01-01", status="present"),
+        AttendanceRecord(employee_id="EMP001", date="2024-01-02", status="half_day"),
+        AttendanceRecord(employee_id="EMP001", date="2024-01-03", status="late"),
+        AttendanceRecord(employee_id="EMP001", date="2024-01-04", status="absent"),
+    ]
+
+    metrics = calculate_attendance_metrics(employee, records)
+
+    assert metrics["half_days"] == 1
+    assert metrics["attendance_percentage"] == 62.5
+    assert metrics["status"] == "below_threshold"
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+import server  # noqa: E402
+from server import (  # noqa: E402
+    ROLLING_WINDOW_DAYS,
+    AttendanceData,
+    AttendanceRecord,
+    Employee,
+    apply_records_to_rolling_state,
+    is_valid_record_date,
+    summarize_rolling_state,
+)
+
+
+def record(date, status):
+    return AttendanceRecord(employee_id="EMP001", date=date, status=status)
+
+
+def test_corrections_can_lower_absence_streaks():
+    state = apply_records_to_rolling_state(None, [
+        record("2024-01-01", "absent"),
+        record("2024-01-02", "absent"),
+        record("2024-01-03", "present"),
+    ])
+    assert (state["current_absence_streak"], state["longest_absence_streak"]) == (0, 2)
+
+    state = apply_records_to_rolling_state(state, [
+        record("2024-01-01", "present"),
+        record("2024-01-02", "present"),
+    ])
+    assert (state["current_absence_streak"], state["longest_absence_streak"]) == (0, 0)
+
+
+def test_window_slides_and_streaks_follow_it():
+    start = datetime(2024, 1, 1)
+    days = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(ROLLING_WINDOW_DAYS + 20)]
+
+    state = None
+    for i in range(0, len(days), 7):
+        batch = [record(day, "absent" if day < days[10] or day >= days[-3] else "present") for day in days[i:i + 7]]
+        state = apply_records_to_rolling_state(state, batch)
+
+    assert len(state["window"]) == ROLLING_WINDOW_DAYS
+    assert state["latest_date"] == days[-1]
+    assert state["current_absence_streak"] == 3
+    assert state["longest_absence_streak"] == 3
+
+
+def test_summary_rates_and_lateness_trend():
+    start = datetime(2024, 1, 1)
+    records = []
+    for i in range(60):
+        day = (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        if i >= 30 and i % 2:
+            status = "late"
+        elif i % 10 == 0:
+            status = "half_day"
+        else:
+            status = "present"
+        records.append(record(day, status))
+
+    summary = summarize_rolling_state(apply_records_to_rolling_state(None, records))
+
+    assert summary["late_rate_previous_30_days"] == 0.0
+    assert summary["late_rate_30_days"] == 50.0
+    assert summary["lateness_trend"] == "worsening"
+    assert summary["attendance_rate_30_days"] == 95.0
+
+
+def test_only_real_iso_dates_are_accepted():
+    assert is_valid_record_date("2024-02-29")
+    for value in [None, "", "01/15/2024", "2024-1-15", "2023-02-29", "2024-13-01", "2024-01-15T09:00", "2024-01-15\n"]:
+        assert not is_valid_record_date(value)
+
+
+class UntouchableDatabase:
+    def __getattr__(self, name):
+        raise AssertionError(f"database accessed: {name}")
+
+
+def test_upload_with_bad_date_is_rejected_before_clearing_data(monkeypatch):
+    monkeypatch.setattr(server, "db", UntouchableDatabase())
+    data = AttendanceData(
+        employees=[Employee(employee_id="EMP001", name="A", department="HR", position="P", email="a@x.com", phone="1")],
+        attendance_records=[record("2024-01-15", "present"), record("01/16/2024", "present")],
+        analysis_period="January 2024",
+    )
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(server.upload_attendance_data(data))
+
+    assert error.value.status_code == 400
+    assert "[1]" in error.value.detail
@@ -0,0 +1,47 @@
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "backend"))
+
+from server import sweep_attendance_thresholds, threshold_sweep  # noqa: E402
+
+
+def test_sweep_counts_employees_at_or_above_each_threshold():
+    percentages = sorted([45.0, 69.9, 70.0, 70.0, 85.5, 100.0])
+
+    sweep = sweep_attendance_thresholds(percentages, [0, 70, 70.1, 100, 100.1])
+
+    assert [(s["threshold"], s["meeting_threshold"], s["below_threshold"]) for s in sweep] == [
+        (0, 6, 0),
+        (70, 4, 2),
+        (70.1, 2, 4),
+        (100, 1, 5),
+        (100.1, 0, 6),
+    ]
+    assert sweep[1]["percentage_meeting"] == 66.7
+
+
+def test_sweep_matches_linear_count():
+    percentages = sorted([(i * 37) % 101 + 0.5 for i in range(200)])
+    thresholds = [t / 2 for t in range(0, 201)]
+
+    for result in sweep_attendance_thresholds(percentages, thresholds):
+        assert result["meeting_threshold"] == len([p for p in percentages if p >= result["threshold"]])
+
+
+def test_sweep_without_results_reports_zero():
+    assert sweep_attendance_thresholds([], [70]) == [
+        {"threshold": 70, "meeting_threshold": 0, "below_threshold": 0, "percentage_meeting": 0}
+    ]
+
+
+@pytest.mark.parametrize("threshold", [float("nan"), -1.0, 100.5])
+def test_sweep_endpoint_rejects_out_of_range_thresholds(threshold):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(threshold_sweep([50.0, threshold]))
+
+    assert error.value.status_code == 400